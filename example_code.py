@@ -13,39 +13,86 @@ Author: Grok 4 (xAI)
 Date  : December 06, 2025
 """
 
+import hashlib
+import json
 import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
+from joblib import Parallel, delayed
 
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import FunctionTransformer, LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import (
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score,
+    precision_recall_fscore_support,
     classification_report,
     confusion_matrix,
     roc_auc_score,
 )
 import xgboost as xgb
 
+# Optional fast CSV/Parquet backend (falls back to pandas if missing)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pa_csv = None
+    pq = None
+
+# Optional GPU support for XGBoost (needs CuPy and a visible CUDA device)
+try:
+    import cupy as cp
+
+    try:
+        XGB_DEVICE = "cuda" if cp.cuda.runtime.getDeviceCount() > 0 else "cpu"
+    except cp.cuda.runtime.CUDARuntimeError:
+        XGB_DEVICE = "cpu"
+except ImportError:
+    cp = None
+    XGB_DEVICE = "cpu"
+
 # ========================================================
 # 1. CONFIGURATION
 # ========================================================
 DATA_PATH = "data/your_dataset.csv"  # Change this to your CSV file path
 MODEL_DIR = "models"
 FIGURE_DIR = "figures"
+CACHE_DIR = "cache"
 RANDOM_STATE = 42
 TEST_SIZE = 0.2
+IO_BACKEND = os.environ.get("RFLOW_IO", "arrow").lower()  # "arrow" or "polars"
+
+# Compression for saved artifacts: lz4 if available, else zlib
+try:
+    import lz4  # noqa: F401
+
+    MODEL_COMPRESS = ("lz4", 3)
+except ImportError:
+    MODEL_COMPRESS = 3
+
+
+def save_artifact(obj, filename: str, directory: str = MODEL_DIR) -> str:
+    """
+    Dump an artifact into `directory` (MODEL_DIR by default) with fast
+    compression and pickle protocol 5. joblib.load detects the
+    compression automatically.
+    """
+    path = os.path.join(directory, filename)
+    joblib.dump(obj, path, compress=MODEL_COMPRESS, protocol=5)
+    return path
+
 
 # Create necessary folders
 os.makedirs(MODEL_DIR, exist_ok=True)
 os.makedirs(FIGURE_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
 
 print("=" * 60)
 print("STARTING FULL ML PIPELINE")
@@ -58,121 +105,328 @@ print(f"\nLoading data from: {DATA_PATH}")
 if not os.path.exists(DATA_PATH):
     raise FileNotFoundError(f"File not found: {DATA_PATH}")
 
-df = pd.read_csv(DATA_PATH)
-print(f"Dataset shape: {df.shape}")
-print(f"\nFirst 5 rows:")
-print(df.head())
 
-print(f"\nDataset info:")
-print(df.info())
+# Strings pandas.read_csv treats as missing by default
+_PANDAS_NA_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+
+def load_dataset(path: str) -> pd.DataFrame:
+    """
+    Read the CSV with a multi-threaded reader and cache it as Parquet.
 
-print(f"\nMissing values per column:")
-print(df.isnull().sum())
+    - RFLOW_IO=polars: read via Polars
+    - otherwise, if PyArrow is installed: reuse `<path>.parquet` when it is
+      newer than the CSV, else parse the CSV with Arrow and write the sidecar
+    - fallback: plain pandas.read_csv
 
-# ========================================================
-# 3. EXPLORATORY DATA ANALYSIS (EDA) - Save figures
-# ========================================================
-print(f"\nGenerating EDA plots...")
+    Missing cells come back as NaN, all-missing columns as float64 and
+    date-like columns as strings, the same as pandas.read_csv, so
+    imputation and encoding see the same data.
+    """
+    if IO_BACKEND == "polars":
+        import polars as pl
+
+        df = pl.read_csv(
+            path, n_threads=os.cpu_count(), null_values=_PANDAS_NA_VALUES
+        ).to_pandas()
+        return _nulls_to_nan(df)
+
+    if pa_csv is None:
+        return pd.read_csv(path)
+
+    parquet_path = path + ".parquet"
+    if (
+        os.path.exists(parquet_path)
+        and os.path.getmtime(parquet_path) >= os.path.getmtime(path)
+    ):
+        print(f"Using cached Parquet: {parquet_path}")
+        # Every column is used below (features + target), so no projection.
+        table = pq.read_table(parquet_path, use_threads=True, buffer_size=64 << 20)
+    else:
+        read_options = pa_csv.ReadOptions(use_threads=True, block_size=64 << 20)
+        table = pa_csv.read_csv(
+            path,
+            read_options=read_options,
+            convert_options=pa_csv.ConvertOptions(
+                null_values=_PANDAS_NA_VALUES, strings_can_be_null=True
+            ),
+        )
+        # Arrow parses ISO dates to timestamps (pandas keeps the raw strings)
+        # and types all-empty columns as null (pandas gives float64)
+        column_types = {}
+        for field in table.schema:
+            if pa.types.is_temporal(field.type):
+                column_types[field.name] = pa.string()
+            elif pa.types.is_null(field.type):
+                column_types[field.name] = pa.float64()
+        if column_types:
+            table = pa_csv.read_csv(
+                path,
+                read_options=read_options,
+                convert_options=pa_csv.ConvertOptions(
+                    null_values=_PANDAS_NA_VALUES,
+                    strings_can_be_null=True,
+                    column_types=column_types,
+                ),
+            )
+        pq.write_table(table, parquet_path, compression="zstd")
+        print(f"Cached Parquet copy: {parquet_path}")
 
-# Target distribution (assume last column is target)
-target_col = df.columns[-1]
-print(f"\nTarget column detected: '{target_col}'")
+    # NumPy-backed dtypes keep select_dtypes / sklearn behaviour unchanged
+    return _nulls_to_nan(table.to_pandas())
 
-plt.figure(figsize=(8, 5))
-sns.countplot(data=df, x=target_col, palette="viridis")
-plt.title(f"Target Distribution - {target_col}")
-plt.xlabel(target_col)
-plt.ylabel("Count")
-plt.tight_layout()
-plt.savefig(os.path.join(FIGURE_DIR, "target_distribution.png"), dpi=300)
-plt.close()
-print("Saved: target_distribution.png")
-
-# Correlation heatmap (only numeric columns)
-numeric_df = df.select_dtypes(include=[np.number])
-if len(numeric_df.columns) > 1:
-    plt.figure(figsize=(12, 10))
-    corr = numeric_df.corr()
-    sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f", linewidths=0.5)
-    plt.title("Correlation Heatmap")
+
+def _nulls_to_nan(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace None in string columns with NaN, as pandas.read_csv does.
+    SimpleImputer(missing_values=np.nan) does not match None.
+    Columns with no values at all become float64, also as in pandas.
+    """
+    obj_cols = df.select_dtypes(include=["object"]).columns
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].where(df[obj_cols].notna(), np.nan)
+        empty_cols = obj_cols[df[obj_cols].isna().all().to_numpy()]
+        if len(empty_cols):
+            df[empty_cols] = df[empty_cols].astype(np.float64)
+    return df
+
+
+class FactorizeEncoder:
+    """
+    Minimal LabelEncoder replacement backed by a pandas Index.
+    Unseen categories are mapped to -1.
+    """
+
+    def __init__(self, uniques: pd.Index):
+        self.uniques = uniques
+        self.classes_ = uniques.to_numpy()
+
+    def transform(self, x) -> np.ndarray:
+        return self.uniques.get_indexer(x)
+
+
+def dataset_cache_dir(path: str) -> str:
+    """
+    Cache directory for preprocessed arrays, keyed by the CSV's
+    path, modification time and size, and by the split settings.
+    """
+    stat = os.stat(path)
+    key = hashlib.blake2b(
+        f"{path}:{stat.st_mtime}:{stat.st_size}:{TEST_SIZE}:{RANDOM_STATE}".encode()
+    ).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, key)
+
+
+CACHE_PATH = dataset_cache_dir(DATA_PATH)
+CACHE_META = os.path.join(CACHE_PATH, "meta.json")
+CACHED_ARRAYS = ("X_train", "X_test", "y_train", "y_test")
+
+if os.path.exists(CACHE_META):
+    # Unchanged CSV: memory-map the preprocessed split instead of re-running
+    # load → EDA → preprocessing (figures were saved by the run that cached it)
+    print(f"Using preprocessed cache: {CACHE_PATH}")
+    X_train, X_test, y_train, y_test = (
+        np.load(os.path.join(CACHE_PATH, f"{name}.npy"), mmap_mode="r")
+        for name in CACHED_ARRAYS
+    )
+    with open(CACHE_META, encoding="utf-8") as f:
+        meta = json.load(f)
+    feature_names = np.array(meta["feature_names"], dtype=object)
+    # Encoders come from the cache entry itself: models/ may hold another
+    # dataset's. Re-save them so models/ matches this dataset again.
+    label_encoders = {
+        col: FactorizeEncoder(joblib.load(os.path.join(CACHE_PATH, filename)))
+        for col, filename in meta["label_encoders"].items()
+    }
+    target_encoder = joblib.load(os.path.join(CACHE_PATH, meta["target_encoder"]))
+    for col, le in label_encoders.items():
+        save_artifact(le.uniques, f"le_{col}.pkl")
+    save_artifact(target_encoder, "label_encoder_target.pkl")
+else:
+    df = load_dataset(DATA_PATH)
+    print(f"Dataset shape: {df.shape}")
+    print(f"\nFirst 5 rows:")
+    print(df.head())
+
+    print(f"\nDataset info:")
+    print(df.info())
+
+    print(f"\nMissing values per column:")
+    print(df.isnull().sum())
+
+    # ========================================================
+    # 3. EXPLORATORY DATA ANALYSIS (EDA) - Save figures
+    # ========================================================
+    print(f"\nGenerating EDA plots...")
+
+    # Target distribution (assume last column is target)
+    target_col = df.columns[-1]
+    print(f"\nTarget column detected: '{target_col}'")
+
+    plt.figure(figsize=(8, 5))
+    sns.countplot(data=df, x=target_col, palette="viridis")
+    plt.title(f"Target Distribution - {target_col}")
+    plt.xlabel(target_col)
+    plt.ylabel("Count")
     plt.tight_layout()
-    plt.savefig(os.path.join(FIGURE_DIR, "correlation_heatmap.png"), dpi=300)
+    plt.savefig(os.path.join(FIGURE_DIR, "target_distribution.png"), dpi=300)
     plt.close()
-    print("Saved: correlation_heatmap.png")
-
-# ========================================================
-# 4. PREPROCESSING
-# ========================================================
-print(f"\nStarting preprocessing...")
-
-X = df.drop(columns=[target_col])
-y = df[target_col]
-
-print(f"Feature matrix shape: {X.shape}")
-print(f"Target vector shape : {y.shape}")
-
-# Handle missing values
-print(f"\nFilling missing values...")
-X = X.fillna(X.median(numeric_only=True))  # numeric columns
-for col in X.select_dtypes(include=["object"]).columns:
-    X[col] = X[col].fillna(X[col].mode()[0])
-
-# Encode categorical features
-label_encoders = {}
-print(f"Encoding categorical columns...")
-for col in X.select_dtypes(include=["object", "category"]).columns:
-    le = LabelEncoder()
-    X[col] = le.fit_transform(X[col].astype(str))
-    label_encoders[col] = le
-    joblib.dump(le, os.path.join(MODEL_DIR, f"le_{col}.pkl"))
-    print(f"   Encoded: {col} → {len(le.classes_)} classes")
-
-# Encode target if it's string
-target_encoder = None
-if y.dtype == "object" or y.dtype.name == "category":
+    print("Saved: target_distribution.png")
+
+    # Correlation heatmap (only numeric columns)
+    numeric_df = df.select_dtypes(include=[np.number])
+    if len(numeric_df.columns) > 1:
+        plt.figure(figsize=(12, 10))
+        values = numeric_df.to_numpy(dtype=np.float64)  # corrcoef works in float64
+        if np.isnan(values).any():
+            corr = numeric_df.corr()  # pairwise handling of missing values
+        else:
+            corr = pd.DataFrame(
+                np.corrcoef(values, rowvar=False),
+                index=numeric_df.columns,
+                columns=numeric_df.columns,
+            )
+        # Per-cell annotations get slow (and unreadable) on wide frames
+        annotate = numeric_df.shape[1] <= 20
+        if annotate:
+            sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f", linewidths=0.5)
+        else:
+            sns.heatmap(corr, annot=False, cmap="coolwarm")
+        plt.title("Correlation Heatmap")
+        plt.tight_layout()
+        plt.savefig(
+            os.path.join(FIGURE_DIR, "correlation_heatmap.png"),
+            dpi=300 if annotate else 150,
+        )
+        plt.close()
+        print("Saved: correlation_heatmap.png")
+
+    # ========================================================
+    # 4. PREPROCESSING
+    # ========================================================
+    print(f"\nStarting preprocessing...")
+
+    X = df.drop(columns=[target_col])
+    y = df[target_col]
+
+    print(f"Feature matrix shape: {X.shape}")
+    print(f"Target vector shape : {y.shape}")
+
+    # Handle missing values
+    print(f"\nFilling missing values...")
+    num_cols = X.select_dtypes(include=[np.number]).columns.to_list()
+    cat_cols = X.select_dtypes(include=["object", "category"]).columns.to_list()
+    imputer = ColumnTransformer(
+        [
+            (
+                "num",
+                SimpleImputer(strategy="median", keep_empty_features=True),
+                num_cols,
+            ),
+            (
+                "cat",
+                SimpleImputer(strategy="most_frequent", keep_empty_features=True),
+                cat_cols,
+            ),
+        ],
+        remainder="passthrough",
+        sparse_threshold=0,
+        verbose_feature_names_out=False,
+    ).set_output(transform="pandas")
+    # One fit/transform for all columns; keep original column order and dtypes
+    X = imputer.fit_transform(X)[X.columns]
+
+    # Encode categorical features
+    label_encoders = {}
+    print(f"Encoding categorical columns...")
+    for col in X.select_dtypes(include=["object", "category"]).columns:
+        codes, uniques = pd.factorize(X[col].astype(str), sort=False)
+        X[col] = codes.astype(np.int32)
+        label_encoders[col] = FactorizeEncoder(uniques)
+        save_artifact(uniques, f"le_{col}.pkl")
+        print(f"   Encoded: {col} → {len(uniques)} classes")
+
+    # Encode target to contiguous int32 labels (also needed by XGBoost for
+    # numeric targets that are not already 0..K-1)
     print(f"Encoding target column '{target_col}'...")
     target_encoder = LabelEncoder()
-    y = target_encoder.fit_transform(y)
-    joblib.dump(target_encoder, os.path.join(MODEL_DIR, "label_encoder_target.pkl"))
+    y = target_encoder.fit_transform(y).astype(np.int32)
+    save_artifact(target_encoder, "label_encoder_target.pkl")
     print(f"   Classes: {list(target_encoder.classes_)}")
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-)
+    # Train-test split on a plain float32 array (cheaper to reorder than a
+    # DataFrame)
+    feature_names = X.columns.to_numpy()
+    X_arr = X.to_numpy(dtype=np.float32)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_arr, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
+    )
+
+    # Save the split for the next run; meta.json is written last so a
+    # partially written cache is never picked up
+    os.makedirs(CACHE_PATH, exist_ok=True)
+    for name, arr in zip(CACHED_ARRAYS, (X_train, X_test, y_train, y_test)):
+        np.save(os.path.join(CACHE_PATH, f"{name}.npy"), arr)
+    for col, le in label_encoders.items():
+        save_artifact(le.uniques, f"le_{col}.pkl", CACHE_PATH)
+    save_artifact(target_encoder, "label_encoder_target.pkl", CACHE_PATH)
+    meta = {
+        "feature_names": feature_names.tolist(),
+        # File names relative to CACHE_PATH
+        "label_encoders": {col: f"le_{col}.pkl" for col in label_encoders},
+        "target_encoder": "label_encoder_target.pkl",
+    }
+    with open(CACHE_META, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"Cached preprocessed arrays: {CACHE_PATH}")
 
 print(f"\nTrain set: {X_train.shape}")
 print(f"Test set : {X_test.shape}")
 
-# Scale features
-print(f"\nApplying StandardScaler...")
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
-joblib.dump(scaler, os.path.join(MODEL_DIR, "scaler.pkl"))
-print("Scaler saved.")
-
 # ========================================================
 # 5. MODEL TRAINING
 # ========================================================
 print(f"\nTraining models...")
 
-models = {}
+# Run both fits concurrently, each with half of the cores
+N_JOBS_PER_MODEL = max(1, (os.cpu_count() or 2) // 2)
 
 # Random Forest
+# Bounded depth/leaf size keeps the forest small enough to stay cache-friendly
 rf = RandomForestClassifier(
     n_estimators=500,
-    max_depth=None,
+    max_depth=16,
     min_samples_split=2,
-    min_samples_leaf=1,
+    min_samples_leaf=5,
+    max_features="sqrt",
+    max_samples=0.8,
     random_state=RANDOM_STATE,
-    n_jobs=-1,
+    n_jobs=N_JOBS_PER_MODEL,
 )
-rf.fit(X_train_scaled, y_train)
-models["Random Forest"] = rf
 
 # XGBoost
+# mlogloss rejects binary targets once an eval_set is evaluated
+n_classes = len(target_encoder.classes_)
 xgb_model = xgb.XGBClassifier(
     n_estimators=500,
     max_depth=6,
@@ -180,11 +434,80 @@ xgb_model = xgb.XGBClassifier(
     subsample=0.8,
     colsample_bytree=0.8,
     random_state=RANDOM_STATE,
-    eval_metric="mlogloss",
+    eval_metric="logloss" if n_classes == 2 else "mlogloss",
+    tree_method="hist",
+    device=XGB_DEVICE,
+    max_bin=256,
+    early_stopping_rounds=20,
+    n_jobs=N_JOBS_PER_MODEL,
     verbosity=0,
 )
-xgb_model.fit(X_train_scaled, y_train)
-models["XGBoost"] = xgb_model
+
+# Scale features only if a scale-sensitive (non-tree) model is in the mix:
+# tree splits are invariant to standardisation, so it would just copy X twice.
+if any(not hasattr(type(m), "feature_importances_") for m in (rf, xgb_model)):
+    print(f"\nApplying StandardScaler...")
+    scaler = StandardScaler()
+    scaler.fit(X_train)
+    X_train_scaled = scaler.transform(X_train).astype(np.float32, copy=False)
+    X_test_scaled = scaler.transform(X_test).astype(np.float32, copy=False)
+else:
+    print(f"\nTree models only, skipping StandardScaler.")
+    scaler = FunctionTransformer(validate=False)  # identity passthrough
+    X_train_scaled, X_test_scaled = X_train, X_test
+
+save_artifact(scaler, "scaler.pkl")
+print("Scaler saved.")
+
+# Hold out part of the training set for early stopping (test set stays unseen).
+# If a stratified hold-out is impossible (a class with one sample, or fewer
+# validation rows than classes), train on everything without early stopping.
+try:
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train_scaled,
+        y_train,
+        test_size=0.1,
+        random_state=RANDOM_STATE,
+        stratify=y_train,
+    )
+    EARLY_STOPPING = True
+    xgb_job = (X_fit, y_fit, {"eval_set": [(X_val, y_val)], "verbose": False})
+except ValueError:
+    print("   Too few samples per class for a hold-out, no early stopping.")
+    EARLY_STOPPING = False
+    xgb_model.set_params(early_stopping_rounds=None)
+    xgb_job = (X_train_scaled, y_train, {})
+print(f"   XGBoost device: {XGB_DEVICE}")
+
+
+def fit_one(name, model, X_, y_, fit_params):
+    """Fit a single model (runs in a joblib worker process)."""
+    if XGB_DEVICE == "cuda" and isinstance(model, xgb.XGBClassifier):
+        # Upload in the worker that trains: device arrays passed in from the
+        # parent would be pickled through host memory
+        X_, y_ = cp.asarray(X_), cp.asarray(y_)
+        if "eval_set" in fit_params:
+            fit_params = {
+                **fit_params,
+                "eval_set": [
+                    (cp.asarray(X_e), cp.asarray(y_e))
+                    for X_e, y_e in fit_params["eval_set"]
+                ],
+            }
+    model.fit(X_, y_, **fit_params)
+    return name, model
+
+
+jobs = [
+    ("Random Forest", rf, X_train_scaled, y_train, {}),
+    ("XGBoost", xgb_model, *xgb_job),
+]
+trained = Parallel(n_jobs=len(jobs), backend="loky")(
+    delayed(fit_one)(*job) for job in jobs
+)
+models = dict(trained)
+if EARLY_STOPPING:
+    print(f"   XGBoost best iteration: {models['XGBoost'].best_iteration}")
 
 print("All models trained successfully.")
 
@@ -197,20 +520,37 @@ print("=" * 60)
 
 results = []
 
-for name, model in models.items():
-    y_pred = model.predict(X_test_scaled)
-    y_proba = model.predict_proba(X_test_scaled)
+# AUC is undefined on a single-class test set, so skip predict_proba there
+need_proba = len(np.unique(y_test)) >= 2
+
+test_predictions = {}
 
-    acc = accuracy_score(y_test, y_pred)
-    prec = precision_score(y_test, y_pred, average="weighted")
-    rec = recall_score(y_test, y_pred, average="weighted")
-    f1 = f1_score(y_test, y_pred, average="weighted")
+for name, model in models.items():
+    # Single ensemble pass: derive the labels from the probabilities
+    if need_proba:
+        y_proba = model.predict_proba(X_test_scaled)
+        y_pred = y_proba.argmax(axis=1)  # labels are encoded as 0..K-1
+    else:
+        y_proba = None
+        y_pred = model.predict(X_test_scaled)
+    test_predictions[name] = y_pred
+
+    # One pass for precision/recall/F1 instead of three separate scorers
+    prec, rec, f1, _ = precision_recall_fscore_support(
+        y_test, y_pred, average="weighted", zero_division=0
+    )
+    acc = (y_pred == y_test).mean()
 
     # AUC only if binary or using one-vs-rest
-    try:
-        auc = roc_auc_score(y_test, y_proba, multi_class="ovr")
-    except:
-        auc = np.nan
+    auc = np.nan
+    if y_proba is not None:
+        try:
+            if y_proba.shape[1] == 2:
+                auc = roc_auc_score(y_test, y_proba[:, 1])
+            else:
+                auc = roc_auc_score(y_test, y_proba, multi_class="ovr")
+        except ValueError:
+            auc = np.nan
 
     results.append(
         {
@@ -258,7 +598,7 @@ best_model = models[best_model_name]
 print(f"\nBest model: {best_model_name} (Accuracy: {results_df['Accuracy'].max():.4f})")
 
 # Confusion Matrix
-y_pred_best = best_model.predict(X_test_scaled)
+y_pred_best = test_predictions[best_model_name]
 cm = confusion_matrix(y_test, y_pred_best)
 
 plt.figure(figsize=(8, 6))
@@ -267,8 +607,8 @@ sns.heatmap(
     annot=True,
     fmt="d",
     cmap="Blues",
-    xticklabels=target_encoder.classes_ if target_encoder else np.unique(y),
-    yticklabels=target_encoder.classes_ if target_encoder else np.unique(y),
+    xticklabels=target_encoder.classes_,
+    yticklabels=target_encoder.classes_,
 )
 plt.title(f"Confusion Matrix - {best_model_name}")
 plt.ylabel("True Label")
@@ -281,10 +621,13 @@ print("Saved: confusion_matrix_best.png")
 # Feature Importance (Random Forest or XGBoost)
 if hasattr(best_model, "feature_importances_"):
     importances = best_model.feature_importances_
-    indices = np.argsort(importances)[::-1][:15]  # Top 15
+    # Top 15: O(F) partial selection, then sort only the selected k
+    k = min(15, len(importances))
+    top = np.argpartition(importances, -k)[-k:]
+    indices = top[np.argsort(importances[top])[::-1]]
 
     plt.figure(figsize=(10, 8))
-    sns.barplot(x=importances[indices], y=X.columns[indices], palette="magma")
+    sns.barplot(x=importances[indices], y=feature_names[indices], palette="magma")
     plt.title(f"Top 15 Feature Importance - {best_model_name}")
     plt.xlabel("Importance Score")
     plt.tight_layout()
@@ -293,13 +636,112 @@ if hasattr(best_model, "feature_importances_"):
     print("Saved: feature_importance.png")
 
 # Save best model
-joblib.dump(best_model, os.path.join(MODEL_DIR, "best_model.pkl"))
+# Store the model single-threaded so loading it doesn't pin a thread pool
+best_model.set_params(n_jobs=1)
+save_artifact(best_model, "best_model.pkl")
+best_model.set_params(n_jobs=N_JOBS_PER_MODEL)
 print(f"\nBest model saved as: best_model.pkl")
 
+# Optional: compile the tree ensemble to a native library (Treelite + TL2cgen).
+# Load it later with:
+#   tl2cgen.Predictor("models/best_model.so").predict(tl2cgen.DMatrix(X))
+NATIVE_PATH = os.path.join(MODEL_DIR, "best_model.so")
+
+
+def evaluated_booster(model):
+    """
+    The XGBoost booster restricted to the trees predict_proba uses. With
+    early stopping the model keeps `early_stopping_rounds` extra trees.
+    """
+    booster = model.get_booster()
+    if EARLY_STOPPING:
+        return booster[: model.best_iteration + 1]
+    return booster
+
+
+try:
+    import tl2cgen
+    import treelite
+
+    if isinstance(best_model, xgb.XGBClassifier):
+        tl_model = treelite.frontend.from_xgboost(evaluated_booster(best_model))
+    else:
+        tl_model = treelite.sklearn.import_model(best_model)
+    tl2cgen.export_lib(
+        tl_model,
+        toolchain="gcc",
+        libpath=NATIVE_PATH,
+        params={"parallel_comp": os.cpu_count() or 1},
+    )
+    print("Compiled model saved as: best_model.so")
+except ImportError:
+    print("Treelite/TL2cgen not installed, skipping native model compilation.")
+except Exception as exc:
+    # Optional step: a missing compiler or failed export must not stop the run
+    print(f"Native model compilation failed ({exc}), skipping.")
+    if os.path.exists(NATIVE_PATH):
+        os.remove(NATIVE_PATH)
+
+# Optional: export to ONNX so predict_new_data can run on ONNX Runtime
+ONNX_PATH = os.path.join(MODEL_DIR, "best_model.onnx")
+ONNX_EXPORTED = False
+# Never serve a previous run's model (other dataset/feature width) below
+if os.path.exists(ONNX_PATH):
+    os.remove(ONNX_PATH)
+try:
+    if isinstance(best_model, xgb.XGBClassifier):
+        from onnxmltools import convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType
+
+        # Convert the sliced booster (onnxmltools accepts a Booster): the
+        # full model would also carry the trees added after the best round
+        onx = convert_xgboost(
+            evaluated_booster(best_model),
+            initial_types=[("X", FloatTensorType([None, X_train_scaled.shape[1]]))],
+        )
+    else:
+        from skl2onnx import to_onnx
+
+        onx = to_onnx(
+            best_model,
+            X_train_scaled[:1].astype(np.float32),
+            options={id(best_model): {"zipmap": False}},
+        )
+    with open(ONNX_PATH, "wb") as f:
+        f.write(onx.SerializeToString())
+    ONNX_EXPORTED = True
+    print("ONNX model saved as: best_model.onnx")
+except ImportError:
+    print("skl2onnx/onnxmltools not installed, skipping ONNX export.")
+except Exception as exc:
+    print(f"ONNX export failed ({exc}), skipping.")
+    if os.path.exists(ONNX_PATH):
+        os.remove(ONNX_PATH)
+
 
 # ========================================================
 # 8. INFERENCE FUNCTION (Ready to use)
 # ========================================================
+_onnx_session = None
+
+
+def _get_onnx_session():
+    """
+    Lazily create (and cache) an ONNX Runtime session for the best model.
+    Returns None if this run did not export ONNX or onnxruntime is missing.
+    """
+    global _onnx_session
+    if _onnx_session is None and ONNX_EXPORTED:
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            return None
+        _onnx_session = ort.InferenceSession(
+            ONNX_PATH, providers=["CPUExecutionProvider"]
+        )
+    return _onnx_session
+
+
 def predict_new_data(new_df: pd.DataFrame):
     """
     Predict on new data (same columns as training, without target)
@@ -307,16 +749,20 @@ def predict_new_data(new_df: pd.DataFrame):
     # Apply same preprocessing
     for col, le in label_encoders.items():
         if col in new_df.columns:
-            new_df[col] = (
-                new_df[col]
-                .astype(str)
-                .apply(lambda x: le.transform([x])[0] if x in le.classes_ else -1)
-            )
+            # Vectorised hash lookup; unseen categories become -1
+            new_df[col] = le.transform(new_df[col].astype(str).to_numpy())
     new_df = new_df.fillna(0)
-    new_scaled = scaler.transform(new_df[X.columns])
+    new_scaled = scaler.transform(
+        new_df[feature_names].to_numpy(dtype=np.float32, copy=False)
+    )
 
-    pred = best_model.predict(new_scaled)
-    proba = best_model.predict_proba(new_scaled)
+    sess = _get_onnx_session()
+    if sess is not None:
+        pred, proba = sess.run(None, {"X": new_scaled.astype(np.float32, copy=False)})
+    else:
+        # One pass over the ensemble; labels are 0..K-1 so argmax is the class
+        proba = best_model.predict_proba(new_scaled)
+        pred = proba.argmax(axis=1)
 
     if target_encoder:
         pred = target_encoder.inverse_transform(pred)
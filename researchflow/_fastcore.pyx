@@ -0,0 +1,32 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional compiled helpers for ResearchFlow.
+
+Build in place with `cythonize -i researchflow/_fastcore.pyx`. When the
+extension is not built, the pure-Python versions are used instead.
+"""
+
+
+cpdef str slugify(str value):
+    """
+    Single-pass equivalent of `scaffold.slugify`.
+
+    Whitespace and '-' runs become one '-' between kept characters;
+    anything outside [a-z0-9] (after lower-casing) is dropped.
+    """
+    cdef Py_UCS4 c
+    cdef bint pending_dash = False
+    cdef bytearray out = bytearray()
+
+    for c in value.strip().lower():
+        if (u"a" <= c <= u"z") or (u"0" <= c <= u"9"):
+            if pending_dash and len(out):
+                out.append(45)  # '-'
+            pending_dash = False
+            out.append(<int>c)
+        elif c == u"-" or c.isspace():
+            pending_dash = True
+
+    if not out:
+        return "untitled"
+    return out.decode("ascii")
@@ -5,6 +5,12 @@ from pathlib import Path
 
 import yaml
 
+# Prefer the libyaml-backed loader when PyYAML was built with it.
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader
+
 
 @dataclass
 class RFlowRawDocument:
@@ -30,21 +36,37 @@ def load_rflow_file(path: Path) -> RFlowRawDocument:
         - Body starts after a blank line following metadata
     """
     text = path.read_text(encoding="utf-8")
-    lines = text.splitlines()
 
-    if not lines or lines[0].strip() != "---":
+    # Work on offsets into `text` instead of splitting it into lines.
+    first_newline = text.find("\n")
+    first_line = text if first_newline == -1 else text[:first_newline]
+    if first_line.strip() != "---":
         raise ValueError(f"Invalid .rflow file (missing opening ---): {path}")
 
-    # Find closing '---'
-    try:
-        end_index = lines.index("---", 1)
-    except ValueError:
+    # Find closing '---': a line that is exactly '---'
+    close_index = -1
+    position = first_newline
+    while position != -1:
+        position = text.find("\n---", position)
+        if position == -1:
+            break
+        after = position + 4
+        if after == len(text) or text[after] == "\n":
+            close_index = position
+            break
+        position = after
+
+    if close_index == -1:
         raise ValueError(f"Invalid .rflow file (missing close ---): {path}")
 
-    yaml_block = "\n".join(lines[1:end_index])
-    body_block = "\n".join(lines[end_index + 1 :]).lstrip("\n")
+    yaml_block = text[first_newline + 1 : close_index]
+    body_block = text[close_index + 5 :]
+    if body_block.endswith("\n"):
+        # Like splitlines(): the final line terminator is not part of the body
+        body_block = body_block[:-1]
+    body_block = body_block.lstrip("\n")
 
-    metadata = yaml.safe_load(yaml_block) or {}
+    metadata = yaml.load(yaml_block, Loader=_YAMLLoader) or {}
 
     return RFlowRawDocument(
         metadata=metadata,
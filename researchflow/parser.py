@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Callable
 
-from .loader import RFlowRawDocument
+from .loader import RFlowRawDocument, load_rflow_file
 from .model import (
     Block,
     CodeBlock,
@@ -26,59 +27,45 @@ def parse_rflow(raw: RFlowRawDocument) -> RFlowDocument:
     - :::log
     - :::code
     """
-    lines = raw.body.splitlines()
-    index = 0
+    body = raw.body
     blocks: list[Block] = []
-    current_plain: list[str] = []
-
-    def flush_plain_block() -> None:
-        """Flush accumulated plain markdown into a MarkdownBlock."""
-        if current_plain:
-            content = "\n".join(current_plain).strip("\n")
-            if content:
-                blocks.append(MarkdownBlock(content=content))
-            current_plain.clear()
-
-    while index < len(lines):
-        line = lines[index]
-        stripped = line.strip()
-
-        # Not a block start → accumulate as plain markdown
-        if not stripped.startswith(":::"):
-            current_plain.append(line)
-            index += 1
-            continue
+    plain_start = 0  # start offset of pending plain markdown
+    position = 0
 
-        # If we reach here, this line starts with ":::"
-        # Try to recognise a supported block.
-        flush_plain_block()  # End any plain markdown before block
+    def flush_plain_block(end: int) -> None:
+        """Flush plain markdown in body[plain_start:end] into a MarkdownBlock."""
+        content = body[plain_start:end].strip("\n")
+        if content:
+            blocks.append(MarkdownBlock(content=content))
 
-        if stripped == ":::summary":
-            block, index = _parse_summary_block(lines, index + 1)
-            blocks.append(block)
-            continue
+    while True:
+        marker = _find_marker_line(body, position)
 
-        if stripped == ":::figure":
-            block, index = _parse_figure_block(lines, index + 1)
-            blocks.append(block)
-            continue
+        # No more block starts → the rest is plain markdown
+        if marker is None:
+            break
 
-        if stripped == ":::log":
-            block, index = _parse_log_block(lines, index + 1)
-            blocks.append(block)
-            continue
+        line_start, line_end = marker
+        stripped = body[line_start:line_end].strip()
+        next_line = line_end + 1
 
-        if stripped == ":::code":
-            block, index = _parse_code_block(lines, index + 1)
-            blocks.append(block)
+        # If we reach here, this line starts with ":::"
+        # Try to recognise a supported block.
+        flush_plain_block(line_start)  # End any plain markdown before block
+
+        parse_block = _BLOCK_PARSERS.get(stripped)
+        if parse_block is None:
+            # Unknown block type: treat marker line as plain markdown
+            plain_start = line_start
+            position = next_line
             continue
 
-        # Unknown block type: treat marker line as plain markdown
-        current_plain.append(line)
-        index += 1
+        content, position = _consume_until_end_marker(body, next_line)
+        blocks.append(parse_block(content))
+        plain_start = position
 
     # Flush any remaining plain markdown at end of document
-    flush_plain_block()
+    flush_plain_block(len(body))
 
     return RFlowDocument(
         metadata=raw.metadata,
@@ -87,54 +74,87 @@ def parse_rflow(raw: RFlowRawDocument) -> RFlowDocument:
     )
 
 
-def _consume_until_end_marker(
-    lines: list[str], start_index: int
-) -> tuple[list[str], int]:
+def load_and_parse(path: Path) -> RFlowDocument:
+    """
+    Load and parse a single `.rflow` file.
+
+    Kept at module level so it can be used as a unit of work in a
+    process pool (see `site.discover_documents`).
     """
-    Consume lines until a closing ':::' marker is found.
+    return parse_rflow(load_rflow_file(path))
+
+
+def _find_marker_line(body: str, position: int) -> tuple[int, int] | None:
+    """
+    Find the next line at or after `position` whose stripped text
+    starts with ':::'.
 
     Returns:
-        (consumed_lines, next_index)
-    where next_index is the position after the closing marker.
+        (line_start, line_end) offsets into body, or None
+    where line_end is the position of the terminating newline (or len(body)).
+    """
+    while True:
+        hit = body.find(":::", position)
+        if hit == -1:
+            return None
+
+        line_start = body.rfind("\n", 0, hit) + 1
+        line_end = body.find("\n", hit)
+        if line_end == -1:
+            line_end = len(body)
+
+        # Only whitespace may precede the marker on its line
+        if not body[line_start:hit].strip():
+            return line_start, line_end
+        position = line_end + 1
+
+
+def _consume_until_end_marker(body: str, start: int) -> tuple[str, int]:
     """
-    collected: list[str] = []
-    index = start_index
+    Consume text until a closing ':::' line is found.
 
-    while index < len(lines):
-        line = lines[index]
-        if line.strip() == ":::":  # closing marker
-            return collected, index + 1
-        collected.append(line)
-        index += 1
+    Returns:
+        (consumed_text, next_position)
+    where next_position is the offset of the line after the closing marker.
+    """
+    position = start
+    while True:
+        hit = body.find(":::", position)
+        if hit == -1:
+            break
+
+        line_start = body.rfind("\n", 0, hit) + 1
+        line_end = body.find("\n", hit)
+        if line_end == -1:
+            line_end = len(body)
+
+        if body[line_start:line_end].strip() == ":::":
+            # closing marker; drop the newline that ends the last content line
+            return body[start : max(start, line_start - 1)], line_end + 1
+        position = line_end + 1
 
     # If we reach here, no closing marker was found.
     # For v0.1 we just return everything; renderer can still do something.
-    return collected, index
+    return body[start:], len(body) + 1
 
 
-def _parse_summary_block(
-    lines: list[str], start_index: int
-) -> tuple[SummaryBlock, int]:
+def _parse_summary_block(content: str) -> SummaryBlock:
     """
     Parse a `:::summary` block.
     Content is treated as markdown text until closing `:::` line.
     """
-    content_lines, next_index = _consume_until_end_marker(lines, start_index)
-    content = "\n".join(content_lines).strip("\n")
-    return SummaryBlock(content=content), next_index
+    return SummaryBlock(content=content.strip("\n"))
 
 
-def _parse_log_block(lines: list[str], start_index: int) -> tuple[LogBlock, int]:
+def _parse_log_block(content: str) -> LogBlock:
     """
     Parse a `:::log` block.
     Content is treated as raw preformatted text.
     """
-    content_lines, next_index = _consume_until_end_marker(lines, start_index)
-    content = "\n".join(content_lines).rstrip("\n")
-    return LogBlock(content=content), next_index
+    return LogBlock(content=content.rstrip("\n"))
 
 
-def _parse_figure_block(lines: list[str], start_index: int) -> tuple[FigureBlock, int]:
+def _parse_figure_block(content: str) -> FigureBlock:
     """
     Parse a `:::figure` block containing simple key: value lines.
     Expected keys:
@@ -142,10 +162,8 @@ def _parse_figure_block(lines: list[str], start_index: int) -> tuple[FigureBlock
     - caption (optional)
     - alt (optional)
     """
-    content_lines, next_index = _consume_until_end_marker(lines, start_index)
-
     data: dict[str, str] = {}
-    for raw_line in content_lines:
+    for raw_line in content.split("\n"):
         stripped = raw_line.strip()
         if not stripped:
             continue
@@ -158,10 +176,10 @@ def _parse_figure_block(lines: list[str], start_index: int) -> tuple[FigureBlock
     caption = data.get("caption")
     alt = data.get("alt")
 
-    return FigureBlock(path=path, caption=caption, alt=alt), next_index
+    return FigureBlock(path=path, caption=caption, alt=alt)
 
 
-def _parse_code_block(lines: list[str], start_index: int) -> tuple[CodeBlock, int]:
+def _parse_code_block(content: str) -> CodeBlock:
     """
     Parse a `:::code` block.
 
@@ -170,13 +188,11 @@ def _parse_code_block(lines: list[str], start_index: int) -> tuple[CodeBlock, in
         - a blank line
         - raw code content
     """
-    content_lines, next_index = _consume_until_end_marker(lines, start_index)
-
     header: dict[str, str] = {}
     code_lines: list[str] = []
 
     in_header = True
-    for raw_line in content_lines:
+    for raw_line in content.split("\n"):
         if in_header:
             # Header continues until a blank line
             if not raw_line.strip():
@@ -199,4 +215,12 @@ def _parse_code_block(lines: list[str], start_index: int) -> tuple[CodeBlock, in
     caption = header.get("caption")
     code = "\n".join(code_lines).rstrip("\n")
 
-    return CodeBlock(language=language, code=code, caption=caption), next_index
+    return CodeBlock(language=language, code=code, caption=caption)
+
+
+_BLOCK_PARSERS: dict[str, Callable[[str], Block]] = {
+    ":::summary": _parse_summary_block,
+    ":::figure": _parse_figure_block,
+    ":::log": _parse_log_block,
+    ":::code": _parse_code_block,
+}
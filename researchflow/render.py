@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import asdict
-from html import escape
 from pathlib import Path
+import os
 from typing import Any
 import markdown
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    select_autoescape,
+)
+from markupsafe import Markup, escape
 
 from .model import (
     Block,
@@ -40,6 +46,35 @@ def render_markdown_to_html(markdown_text: str) -> str:
     )
 
 
+def _markdown_filter(markdown_text: str) -> Markup:
+    """
+    Jinja filter used by `blocks.html`: markdown → trusted HTML.
+    """
+    return Markup(render_markdown_to_html(markdown_text))
+
+
+# researchflow/render.py → researchflow/ → project root
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_TEMPLATES_DIR = _PROJECT_ROOT / "templates"
+
+
+def _create_bytecode_cache(cache_dir: Path) -> FileSystemBytecodeCache:
+    """
+    Cache compiled templates on disk so new processes skip compilation.
+
+    Falls back to Jinja's per-user temp directory if `cache_dir`
+    cannot be created or written (e.g. read-only install, or a cache
+    left behind by a build run as another user).
+    """
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return FileSystemBytecodeCache()
+    if not os.access(cache_dir, os.W_OK | os.X_OK):
+        return FileSystemBytecodeCache()
+    return FileSystemBytecodeCache(directory=str(cache_dir))
+
+
 def _create_jinja_environment() -> Environment:
     """
     Create a Jinja2 environment pointing to the project's `templates/` folder.
@@ -47,20 +82,47 @@ def _create_jinja_environment() -> Environment:
     For MVP v0.1 we assume the templates directory sits at:
     project_root / "templates"
     """
-    # researchflow/render.py → researchflow/ → project root
-    project_root = Path(__file__).resolve().parent.parent
-    templates_dir = project_root / "templates"
-
     env = Environment(
-        loader=FileSystemLoader(str(templates_dir)),
+        loader=FileSystemLoader(str(_TEMPLATES_DIR)),
         autoescape=select_autoescape(["html", "xml"]),
         enable_async=False,
+        bytecode_cache=_create_bytecode_cache(_PROJECT_ROOT / ".rflow_cache"),
     )
+    # All block text is escaped by autoescape (MarkupSafe's C escape, one
+    # pass, clean strings returned as-is). Avoid Python-level escaping here.
+    env.filters["markdown"] = _markdown_filter
     return env
 
 
+# Write buffer for generated pages: large enough that a typical page is
+# flushed with a single write() instead of 8 KiB chunks.
+OUTPUT_BUFFER_SIZE = 1 << 20
+
 _ENV = _create_jinja_environment()
 
+# Block type → macro in `templates/blocks.html`. Looked up by exact type,
+# so adding a block class means adding an entry here.
+_BLOCK_MACROS = _ENV.get_template("blocks.html").module
+_DISPATCH = {
+    SummaryBlock: _BLOCK_MACROS.render_summary,
+    FigureBlock: _BLOCK_MACROS.render_figure,
+    LogBlock: _BLOCK_MACROS.render_log,
+    CodeBlock: _BLOCK_MACROS.render_code,
+    MarkdownBlock: _BLOCK_MACROS.render_markdown,
+}
+_render_unknown = _BLOCK_MACROS.render_unknown
+
+
+def _render_block(block: Block) -> Markup:
+    """
+    Render one block with the macro registered for its type.
+    """
+    return _DISPATCH.get(type(block), _render_unknown)(block)
+
+
+_ENV.globals["render_block"] = _render_block
+_DOC_TEMPLATE = _ENV.get_template("document.html")
+
 
 def get_template_environment() -> Environment:
     """
@@ -72,88 +134,170 @@ def get_template_environment() -> Environment:
     return _ENV
 
 
-def render_document(doc: RFlowDocument) -> str:
+def get_templates_mtime() -> int:
     """
-    Render a single RFlowDocument into a full HTML page string.
+    Latest modification time (in ns) of any template file.
 
-    This is the main entry point for turning a parsed `.rflow`
-    document into HTML for the MVP v0.1.
+    The site builder compares this against existing output pages to
+    decide whether they need to be rendered again.
     """
-    template = _ENV.get_template("document.html")
-    blocks_html = [_render_block(block) for block in doc.blocks]
+    latest = 0
+    with os.scandir(_TEMPLATES_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith(".html") and entry.is_file():
+                latest = max(latest, entry.stat().st_mtime_ns)
+    return latest
+
+
+# Fast path for the common "one markdown block, no date/tags" note: the page
+# is rendered once through the real templates with placeholder values, and
+# matching documents are assembled from the static pieces around them.
+_PLACEHOLDER_TITLE = "@@rflow-title@@"
+_PLACEHOLDER_TYPE = "@@rflow-type@@"
+_PLACEHOLDER_BODY = "@@rflow-body@@"
+
 
-    return template.render(
-        doc=doc,
-        blocks_html=blocks_html,
+def _render_probe(
+    metadata: dict[str, object] | None = None, path: str = "<probe>"
+) -> str:
+    """
+    Render a placeholder single-markdown-block document through Jinja.
+    """
+    probe = RFlowDocument(
+        metadata={
+            "title": _PLACEHOLDER_TITLE,
+            "type": _PLACEHOLDER_TYPE,
+            **(metadata or {}),
+        },
+        blocks=[MarkdownBlock(content=_PLACEHOLDER_BODY)],
+        path=Path(path),
     )
+    return _DOC_TEMPLATE.render(doc=probe)
 
 
-def _render_block(block: Block) -> str:
+def _build_markdown_page_shell(reference: str) -> tuple[str, ...] | None:
     """
-    Render an individual block into a small HTML fragment.
+    Split a placeholder rendering of `document.html` into the static
+    pieces around the title, the type and the markdown body.
 
-    Note:
-        - For v0.1, markdown content is not yet converted to rich HTML.
-          It is shown as preformatted text so that the structure works.
-        - In later steps, we will integrate a markdown renderer and
-          syntax highlighting for code.
+    Returns None (fast path disabled) if the templates do not contain
+    each placeholder exactly once, in that order.
     """
-    if isinstance(block, SummaryBlock):
-        content = escape(block.content)
-        return (
-            "<section class='rf-block-summary'>"
-            "<div class='rf-block-summary-title'>Summary</div>"
-            f"<div>{content}</div>"
-            "</section>"
-        )
+    rest = reference
+    pieces: list[str] = []
+    markers = (
+        _PLACEHOLDER_TITLE,
+        _PLACEHOLDER_TYPE,
+        render_markdown_to_html(_PLACEHOLDER_BODY),
+    )
+    for marker in markers:
+        before, found, rest = rest.partition(marker)
+        if not found or marker in rest:
+            return None
+        pieces.append(before)
+    pieces.append(rest)
+    return tuple(pieces)
 
-    if isinstance(block, FigureBlock):
-        # Normalise path so that "assets/..." becomes "/assets/..."
-        raw_path = (block.path or "").strip()
-
-        if raw_path.startswith("/"):
-            normalised_path = raw_path
-        else:
-            # For MVP v0.1 we treat figure paths as site-root relative.
-            # This makes "assets/..." resolve to "/assets/..." when served from build/.
-            normalised_path = f"/{raw_path}" if raw_path else ""
-
-        src = escape(normalised_path)
-        alt = escape(block.alt) if block.alt else ""
-        caption = escape(block.caption) if block.caption else ""
-        caption_html = (
-            f"<div class='rf-block-figure-caption'>{caption}</div>" if caption else ""
-        )
-        return (
-            "<figure class='rf-block-figure'>"
-            f"<img src='{src}' alt='{alt}' />"
-            f"{caption_html}"
-            "</figure>"
-        )
 
-    if isinstance(block, LogBlock):
-        content = escape(block.content)
-        return f"<pre class='rf-block-log'>{content}</pre>"
-
-    if isinstance(block, CodeBlock):
-        code = escape(block.code)
-        language_class = f" language-{block.language}" if block.language else ""
-        caption_html = (
-            f"<div class='rf-block-code-caption'>{escape(block.caption)}</div>"
-            if block.caption
-            else ""
-        )
-        return (
-            "<section class='rf-block-code'>"
-            f"<pre><code class='{language_class}'>{code}</code></pre>"
-            f"{caption_html}"
-            "</section>"
+# Metadata a fast-path document may carry besides title and type, with a
+# probe value: date and tags only when empty, the others with any value.
+_FAST_PATH_KEY_PROBES: dict[str, object] = {
+    "date": "",
+    "tags": [],
+    "slug": "@@rflow-probe@@",
+    "summary": "@@rflow-probe@@",
+}
+
+
+def _find_fast_path_keys(reference: str) -> frozenset[str]:
+    """
+    Metadata keys the shell is known not to depend on (plus title/type).
+
+    A key is allowed only if setting it to its probe value leaves the
+    placeholder page unchanged, so templates that start reading it turn
+    the fast path off for documents that have it. Returns an empty set
+    (fast path disabled) if the page depends on the document path.
+    """
+    if _render_probe(path="<other-probe>") != reference:
+        return frozenset()
+
+    keys = {"title", "type"}
+    for key, value in _FAST_PATH_KEY_PROBES.items():
+        if _render_probe({key: value}) == reference:
+            keys.add(key)
+    return frozenset(keys)
+
+
+_PROBE_PAGE = _render_probe()
+_MARKDOWN_PAGE_SHELL = _build_markdown_page_shell(_PROBE_PAGE)
+_FAST_PATH_KEYS = _find_fast_path_keys(_PROBE_PAGE)
+
+
+def _render_markdown_page(doc: RFlowDocument) -> str | None:
+    """
+    Render `doc` without Jinja if it is a single markdown block whose
+    metadata only uses `_FAST_PATH_KEYS`, with no date or tags; return
+    None otherwise.
+    """
+    if _MARKDOWN_PAGE_SHELL is None or len(doc.blocks) != 1:
+        return None
+
+    block = doc.blocks[0]
+    meta = doc.metadata
+    if type(block) is not MarkdownBlock or not meta.keys() <= _FAST_PATH_KEYS:
+        return None
+    if meta.get("date") or meta.get("tags"):
+        return None
+
+    head, between, before_body, tail = _MARKDOWN_PAGE_SHELL
+    return "".join(
+        (
+            head,
+            escape(meta.get("title") or "Untitled document"),
+            between,
+            escape(meta.get("type") or "note"),
+            before_body,
+            render_markdown_to_html(block.content),
+            tail,
         )
+    )
 
-    if isinstance(block, MarkdownBlock):
-        html = render_markdown_to_html(block.content)
-        return f"<div class='rf-block-markdown'>{html}</div>"
 
-    # Fallback: unknown block type → escaped repr
-    content = escape(repr(block))
-    return f"<div class='rf-block-unknown'>{content}</div>"
+def render_document(doc: RFlowDocument) -> str:
+    """
+    Render a single RFlowDocument into a full HTML page string.
+
+    This is the main entry point for turning a parsed `.rflow`
+    document into HTML for the MVP v0.1. Blocks are rendered by the
+    per-type macros in `templates/blocks.html` (see `_render_block`);
+    plain single-block notes skip Jinja (see `_render_markdown_page`).
+    """
+    html = _render_markdown_page(doc)
+    if html is not None:
+        return html
+    return _DOC_TEMPLATE.render(doc=doc)
+
+
+def render_document_to(doc: RFlowDocument, path: Path) -> None:
+    """
+    Render a single RFlowDocument straight into the file at `path`.
+
+    Streams template output to disk instead of building the whole page
+    as one string first; used by the site builder. The page is written
+    to a temporary file next to `path` and moved into place when done,
+    so a failed render never leaves a truncated (but newer) page behind.
+    """
+    html = _render_markdown_page(doc)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(
+            tmp_path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE
+        ) as f:
+            if html is not None:
+                f.write(html)
+            else:
+                _DOC_TEMPLATE.stream(doc=doc).dump(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
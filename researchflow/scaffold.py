@@ -3,8 +3,13 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
+import os
 import re
 
+_WHITESPACE_RE = re.compile(r"\s+")
+_NON_SLUG_CHARS_RE = re.compile(r"[^a-z0-9\-]")
+_REPEATED_DASHES_RE = re.compile(r"-{2,}")
+
 
 def slugify(value: str) -> str:
     """
@@ -18,24 +23,38 @@ def slugify(value: str) -> str:
         - strip leading/trailing '-'
     """
     value = value.strip().lower()
-    value = re.sub(r"\s+", "-", value)
-    value = re.sub(r"[^a-z0-9\-]", "", value)
-    value = re.sub(r"-{2,}", "-", value)
+    value = _WHITESPACE_RE.sub("-", value)
+    value = _NON_SLUG_CHARS_RE.sub("", value)
+    value = _REPEATED_DASHES_RE.sub("-", value)
     return value.strip("-") or "untitled"
 
 
+# Use the compiled single-pass version when `_fastcore.pyx` has been built.
+try:
+    from ._fastcore import slugify  # noqa: F811
+except ImportError:
+    pass
+
+
 def _ensure_unique_path(base_dir: Path, slug: str) -> Path:
     """
     Ensure the `.rflow` file path is unique inside base_dir.
 
     If `slug.rflow` exists, try `slug-2.rflow`, `slug-3.rflow`, ...
+
+    The directory is listed once; candidates are checked in memory.
+    Names are compared lower-cased so case-insensitive filesystems
+    behave like the previous `exists()` check.
     """
-    candidate = base_dir / f"{slug}.rflow"
+    with os.scandir(base_dir) as entries:
+        existing = {entry.name.lower() for entry in entries}
+
+    name = f"{slug}.rflow"
     counter = 2
-    while candidate.exists():
-        candidate = base_dir / f"{slug}-{counter}.rflow"
+    while name.lower() in existing:
+        name = f"{slug}-{counter}.rflow"
         counter += 1
-    return candidate
+    return base_dir / name
 
 
 def create_note(workspace_root: Path, title: str) -> Path:
@@ -1,16 +1,39 @@
 from __future__ import annotations
 
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+import os
 import shutil
 
-from collections import defaultdict
+from itertools import chain
+from operator import itemgetter
 from typing import Any
 
+# Optional: concurrent index page writes (not in requirements.txt)
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
 from .loader import load_rflow_file
-from .parser import parse_rflow
+from .parser import load_and_parse, parse_rflow
 from .model import RFlowDocument
-from .render import render_document, get_template_environment
+from .render import (
+    OUTPUT_BUFFER_SIZE,
+    get_template_environment,
+    get_templates_mtime,
+    render_document_to,
+)
+
+# Index templates are loaded once and reused across builds.
+_ENV = get_template_environment()
+_HOME_TEMPLATE = _ENV.get_template("home.html")
+_NOTES_INDEX_TEMPLATE = _ENV.get_template("notes_index.html")
+_EXPERIMENTS_INDEX_TEMPLATE = _ENV.get_template("experiments_index.html")
+_TAG_INDEX_TEMPLATE = _ENV.get_template("tag_index.html")
 
 
 @dataclass
@@ -44,58 +67,95 @@ def discover_documents(workspace_root: Path) -> list[SiteDocument]:
     it falls back to the directory kind.
     """
     documents: list[SiteDocument] = []
+    candidates: list[tuple[str, Path]] = []
 
     for kind, subdir in (("note", "notes"), ("experiment", "experiments")):
         dir_path = workspace_root / subdir
         if not dir_path.is_dir():
             continue
 
-        for path in sorted(dir_path.glob("*.rflow")):
-            raw = load_rflow_file(path)
-            doc = parse_rflow(raw)
-
-            # Determine final kind: prefer metadata if valid
-            meta_type = str(doc.metadata.get("type") or kind).lower()
-            if meta_type not in ("note", "experiment"):
-                meta_type = kind
-
-            # Determine slug: metadata.slug > file name
-            slug_value = doc.metadata.get("slug")
-            slug = str(slug_value) if slug_value else path.stem
-
-            documents.append(
-                SiteDocument(
-                    kind=meta_type,
-                    slug=slug,
-                    source_path=path,
-                    document=doc,
-                )
+        with os.scandir(dir_path) as entries:
+            names = sorted(
+                entry.name
+                for entry in entries
+                if entry.name.endswith(".rflow") and entry.is_file()
             )
+        for name in names:
+            candidates.append((kind, dir_path / name))
+
+    parsed = _load_and_parse_all([path for _, path in candidates])
+
+    for (kind, path), doc in zip(candidates, parsed):
+        # Determine final kind: prefer metadata if valid
+        meta_type = str(doc.metadata.get("type") or kind).lower()
+        if meta_type not in ("note", "experiment"):
+            meta_type = kind
+
+        # Determine slug: metadata.slug > file name
+        slug_value = doc.metadata.get("slug")
+        slug = str(slug_value) if slug_value else path.stem
+
+        documents.append(
+            SiteDocument(
+                kind=meta_type,
+                slug=slug,
+                source_path=path,
+                document=doc,
+            )
+        )
 
     return documents
 
 
+# Below this many files, process start-up costs more than it saves.
+_PARALLEL_MIN_FILES = 32
+
+
+def _load_and_parse_all(paths: list[Path]) -> list[RFlowDocument]:
+    """
+    Load and parse `.rflow` files, returning documents in the same order.
+
+    Large workspaces are spread across a process pool, since YAML and
+    block parsing are CPU-bound and hold the GIL. Smaller ones read
+    files on a thread pool (I/O releases the GIL) and parse serially.
+    """
+    if not paths:
+        return []
+
+    if len(paths) < _PARALLEL_MIN_FILES:
+        with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+            raws = list(executor.map(load_rflow_file, paths))
+        return [parse_rflow(raw) for raw in raws]
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return list(executor.map(load_and_parse, paths, chunksize=8))
+
+
 def build_site(workspace_root: Path, build_root: Path) -> None:
     """
     Build the static site into `build_root` from the given workspace.
 
     For MVP v0.1 this function:
-        - clears the existing build directory
         - discovers all `.rflow` documents
         - renders each document into:
             build/notes/<slug>/index.html
             build/experiments/<slug>/index.html
+          skipping pages that are newer than both their source file
+          and every template, and were rendered from that same file
+          (incremental build, tracked in `.rflow-manifest.json`)
+        - removes pages of documents that no longer exist
         - copies `assets/` to `build/assets/` if it exists
     """
-    # 1. Reset build directory
-    if build_root.exists():
-        shutil.rmtree(build_root)
+    # 1. Ensure build directory (existing output is reused, see step 3)
     build_root.mkdir(parents=True, exist_ok=True)
 
     # 2. Discover documents
     documents = discover_documents(workspace_root)
 
-    # 3. Render each document to its respective output path
+    # 3. Render each document to its respective output path.
+    # Output directories are created serially so workers never race on
+    # mkdir; if two documents share a slug the later one wins, as before.
+    targets: dict[Path, SiteDocument] = {}
     for site_doc in documents:
         if site_doc.kind == "note":
             section = "notes"
@@ -104,21 +164,220 @@ def build_site(workspace_root: Path, build_root: Path) -> None:
 
         output_dir = build_root / section / site_doc.slug
         output_dir.mkdir(parents=True, exist_ok=True)
+        targets[output_dir / "index.html"] = site_doc
+
+    _prune_stale_pages(build_root, targets)
+
+    # The manifest records which source produced each page, so a page is
+    # re-rendered when another document takes over its slug.
+    previous_sources = _load_manifest(build_root)
+    sources = {
+        output_path.relative_to(build_root).as_posix(): str(site_doc.source_path)
+        for output_path, site_doc in targets.items()
+    }
+
+    templates_mtime = get_templates_mtime()
+    outdated = {
+        output_path: site_doc
+        for (output_path, site_doc), (page, source) in zip(
+            targets.items(), sources.items()
+        )
+        if previous_sources.get(page) != source
+        or not _is_up_to_date(site_doc.source_path, output_path, templates_mtime)
+    }
+
+    if len(outdated) < _PARALLEL_MIN_FILES:
+        for output_path, site_doc in outdated.items():
+            _render_one(site_doc, output_path)
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            # Consume the iterator so worker errors are raised here
+            list(
+                executor.map(
+                    _render_one, outdated.values(), outdated.keys(), chunksize=8
+                )
+            )
 
-        html = render_document(site_doc.document)
-        output_path = output_dir / "index.html"
-        output_path.write_text(html, encoding="utf-8")
+    # Only written once every page rendered, so failures are retried
+    _save_manifest(build_root, sources)
 
-    # 4. Copy assets directory if present
+    # 4. Mirror assets directory if present
     assets_src = workspace_root / "assets"
+    assets_dst = build_root / "assets"
     if assets_src.is_dir():
-        assets_dst = build_root / "assets"
-        shutil.copytree(assets_src, assets_dst, dirs_exist_ok=True)
+        _link_tree(assets_src, assets_dst)
+    else:
+        shutil.rmtree(assets_dst, ignore_errors=True)
 
-    # 5. Build index pages
+    # 5. Build index pages (tag pages are regenerated from scratch)
+    shutil.rmtree(build_root / "tags", ignore_errors=True)
     build_indexes(documents, build_root)
 
 
+_MANIFEST_NAME = ".rflow-manifest.json"
+
+
+def _load_manifest(build_root: Path) -> dict[str, str]:
+    """
+    Load the page → source mapping written by the previous build.
+
+    A missing or unreadable manifest yields an empty mapping, which
+    makes every page look outdated.
+    """
+    try:
+        with open(build_root / _MANIFEST_NAME, encoding="utf-8") as f:
+            sources = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return sources if isinstance(sources, dict) else {}
+
+
+def _save_manifest(build_root: Path, sources: dict[str, str]) -> None:
+    """Write the page → source mapping for the next incremental build."""
+    with open(build_root / _MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(sources, f, indent=2, sort_keys=True)
+
+
+def _is_up_to_date(source_path: Path, output_path: Path, templates_mtime: int) -> bool:
+    """
+    Return True if `output_path` is newer than its source and all templates.
+    """
+    try:
+        output_mtime = os.stat(output_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return (
+        os.stat(source_path).st_mtime_ns <= output_mtime
+        and templates_mtime <= output_mtime
+    )
+
+
+def _prune_stale_pages(build_root: Path, targets: dict[Path, SiteDocument]) -> None:
+    """
+    Remove `notes/<slug>/` and `experiments/<slug>/` output directories
+    that no longer belong to any document in `targets`.
+    """
+    keep = {output_path.relative_to(build_root).parts[:2] for output_path in targets}
+
+    for section in ("notes", "experiments"):
+        section_dir = build_root / section
+        if not section_dir.is_dir():
+            continue
+
+        with os.scandir(section_dir) as entries:
+            stale = [
+                entry.path
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+                and (section, entry.name) not in keep
+            ]
+        for path in stale:
+            shutil.rmtree(path)
+
+
+def _link_tree(src: Path, dst: Path) -> None:
+    """
+    Mirror `src` into `dst`, with files as hardlinks.
+
+    Falls back to `shutil.copy2` where linking is not possible (e.g.
+    `build_root` is on another filesystem). Files already linked from a
+    previous build are left alone; entries of `dst` that no longer
+    exist in `src` are removed, so `dst` matches a fresh copy.
+    """
+    if os.path.lexists(dst) and not os.path.isdir(dst):
+        os.unlink(dst)
+    os.makedirs(dst, exist_ok=True)
+
+    with os.scandir(src) as entries:
+        src_entries = list(entries)
+    names = {entry.name for entry in src_entries}
+
+    for entry in src_entries:
+        target = os.path.join(dst, entry.name)
+        if entry.is_dir():
+            _link_tree(Path(entry.path), Path(target))
+            continue
+
+        if os.path.isdir(target) and not os.path.islink(target):
+            shutil.rmtree(target)
+        else:
+            try:
+                if os.path.samefile(entry.path, target):
+                    continue
+                os.unlink(target)
+            except FileNotFoundError:
+                pass
+
+        try:
+            os.link(entry.path, target)
+        except OSError:
+            shutil.copy2(entry.path, target)
+
+    with os.scandir(dst) as entries:
+        stale = [entry for entry in entries if entry.name not in names]
+    for entry in stale:
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.unlink(entry.path)
+
+
+def _render_one(site_doc: SiteDocument, output_path: Path) -> None:
+    """
+    Render a single document to `output_path`.
+
+    Module-level so it can be dispatched to a process pool.
+    """
+    render_document_to(site_doc.document, output_path)
+
+
+def _write_html(path: Path, html: str) -> None:
+    """Write a generated page using a large buffer (one write per page)."""
+    with open(path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE) as f:
+        f.write(html)
+
+
+def _write_pages(pages: list[tuple[Path, str]]) -> None:
+    """
+    Write rendered pages, concurrently via `aiofiles` when it is installed.
+
+    Pages are written synchronously when called from inside a running
+    event loop (e.g. Jupyter), where `asyncio.run` is not allowed.
+    """
+    if aiofiles is not None and not _in_event_loop():
+        asyncio.run(_write_pages_async(pages))
+        return
+
+    for path, html in pages:
+        _write_html(path, html)
+
+
+def _in_event_loop() -> bool:
+    """Return True if called from a thread running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+# Upper bound on index pages open for writing at once (avoids EMFILE
+# in workspaces with thousands of tags).
+_MAX_CONCURRENT_WRITES = 64
+
+
+async def _write_pages_async(pages: list[tuple[Path, str]]) -> None:
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_WRITES)
+
+    async def write_one(path: Path, html: str) -> None:
+        async with semaphore, aiofiles.open(
+            path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE
+        ) as f:
+            await f.write(html)
+
+    await asyncio.gather(*(write_one(path, html) for path, html in pages))
+
+
 def _document_to_index_item(site_doc: SiteDocument) -> dict[str, Any]:
     """
     Convert a SiteDocument into a simple dictionary suitable
@@ -132,6 +391,7 @@ def _document_to_index_item(site_doc: SiteDocument) -> dict[str, Any]:
         - date
         - summary
         - tags
+        - _sortkey (date as a string, "" if missing; used for sorting)
     """
     meta = site_doc.document.metadata
 
@@ -144,7 +404,9 @@ def _document_to_index_item(site_doc: SiteDocument) -> dict[str, Any]:
     if isinstance(tags, str):
         tags = [tags]
     elif isinstance(tags, list):
-        tags = [str(t) for t in tags]
+        # Common case: YAML already gave us strings, so reuse the list
+        if not all(type(t) is str for t in tags):
+            tags = [str(t) for t in tags]
     else:
         tags = []
 
@@ -159,6 +421,7 @@ def _document_to_index_item(site_doc: SiteDocument) -> dict[str, Any]:
         "date": date,
         "summary": summary,
         "tags": tags,
+        "_sortkey": str(date) if date is not None else "",
     }
 
 
@@ -171,33 +434,27 @@ def build_indexes(documents: list[SiteDocument], build_root: Path) -> None:
         - Experiments index: build/experiments/index.html
         - Tag pages: build/tags/<tag>/index.html
     """
-    env = get_template_environment()
-
     # Prepare items
-    note_items = [
-        _document_to_index_item(doc) for doc in documents if doc.kind == "note"
-    ]
-    experiment_items = [
-        _document_to_index_item(doc) for doc in documents if doc.kind == "experiment"
-    ]
+    items = [_document_to_index_item(doc) for doc in documents]
+    note_items = [item for item in items if item["kind"] == "note"]
+    experiment_items = [item for item in items if item["kind"] == "experiment"]
 
     # Sort by date descending (string sort works for YYYY-MM-DD)
-    def sort_key(item: dict[str, Any]) -> str:
-        date = item.get("date")
-        return str(date) if date is not None else ""
-
+    sort_key = itemgetter("_sortkey")
     note_items.sort(key=sort_key, reverse=True)
     experiment_items.sort(key=sort_key, reverse=True)
 
     # Build tag map
-    tag_map: dict[str, list[dict[str, Any]]] = defaultdict(list)
-    for item in note_items + experiment_items:
+    tag_map: dict[str, list[dict[str, Any]]] = {}
+    for item in chain(note_items, experiment_items):
         for tag in item["tags"]:
-            tag_map[tag].append(item)
+            tag_map.setdefault(tag, []).append(item)
+
+    # Render every page first, then write them out together
+    pages: list[tuple[Path, str]] = []
 
     # Home page
-    home_template = env.get_template("home.html")
-    home_html = home_template.render(
+    home_html = _HOME_TEMPLATE.render(
         site_title="ResearchFlow",
         notes_count=len(note_items),
         experiments_count=len(experiment_items),
@@ -205,31 +462,29 @@ def build_indexes(documents: list[SiteDocument], build_root: Path) -> None:
         recent_experiments=experiment_items[:5],
         tags=sorted(tag_map.keys()),
     )
-    (build_root / "index.html").write_text(home_html, encoding="utf-8")
+    pages.append((build_root / "index.html", home_html))
 
     # Notes index
-    notes_index_template = env.get_template("notes_index.html")
-    notes_index_html = notes_index_template.render(items=note_items)
+    notes_index_html = _NOTES_INDEX_TEMPLATE.render(items=note_items)
     notes_index_path = build_root / "notes" / "index.html"
     notes_index_path.parent.mkdir(parents=True, exist_ok=True)
-    notes_index_path.write_text(notes_index_html, encoding="utf-8")
+    pages.append((notes_index_path, notes_index_html))
 
     # Experiments index
-    experiments_index_template = env.get_template("experiments_index.html")
-    experiments_index_html = experiments_index_template.render(items=experiment_items)
+    experiments_index_html = _EXPERIMENTS_INDEX_TEMPLATE.render(
+        items=experiment_items
+    )
     experiments_index_path = build_root / "experiments" / "index.html"
     experiments_index_path.parent.mkdir(parents=True, exist_ok=True)
-    experiments_index_path.write_text(
-        experiments_index_html,
-        encoding="utf-8",
-    )
+    pages.append((experiments_index_path, experiments_index_html))
 
     # Tag pages
-    tag_template = env.get_template("tag_index.html")
     tags_root = build_root / "tags"
-    for tag, items in tag_map.items():
+    for tag, tag_items in tag_map.items():
         tag_dir = tags_root / tag
         tag_dir.mkdir(parents=True, exist_ok=True)
 
-        tag_html = tag_template.render(tag=tag, items=items)
-        (tag_dir / "index.html").write_text(tag_html, encoding="utf-8")
+        tag_html = _TAG_INDEX_TEMPLATE.render(tag=tag, items=tag_items)
+        pages.append((tag_dir / "index.html", tag_html))
+
+    _write_pages(pages)